@@ -0,0 +1,266 @@
+##
+# \brief JITed elementwise kernels used by the gaussian and t copula.
+# Each kernel makes a single pass over the sample arrays, evaluating
+# the normal quantile/cdf and the density (or h function) per sample
+# without allocating numpy temporaries.
+from __future__ import print_function, absolute_import, division
+import math
+import numpy as np
+from numba import jit
+
+
+# Wichura, M. J. (1988) Algorithm AS 241: The percentage points of the
+# normal distribution.  Coefficients of the PPND16 rational approximations.
+_A = np.array([3.3871328727963666080e0, 1.3314166789178437745e+2,
+               1.9715909503065514427e+3, 1.3731693765509461125e+4,
+               4.5921953931549871457e+4, 6.7265770927008700853e+4,
+               3.3430575583588128105e+4, 2.5090809287301226727e+3])
+_B = np.array([1.0, 4.2313330701600911252e+1,
+               6.8718700749205790830e+2, 5.3941960214247511077e+3,
+               2.1213794301586595867e+4, 3.9307895800092710610e+4,
+               2.8729085735721942674e+4, 5.2264952788528545610e+3])
+_C = np.array([1.42343711074968357734e0, 4.63033784615654529590e0,
+               5.76949722146069140550e0, 3.64784832476320460504e0,
+               1.27045825245236838258e0, 2.41780725177450611770e-1,
+               2.27238449892691845833e-2, 7.74545014278341407640e-4])
+_D = np.array([1.0, 2.05319162663775882187e0,
+               1.67638483018380384940e0, 6.89767334985100004550e-1,
+               1.48103976427480074590e-1, 1.51986665636164571966e-2,
+               5.47593808499534494600e-4, 1.05075007164441684324e-9])
+_E = np.array([6.65790464350110377720e0, 5.46378491116411436990e0,
+               1.78482653991729133580e0, 2.96560571828504891230e-1,
+               2.65321895265761230930e-2, 1.24266094738807843860e-3,
+               2.71155556874348757815e-5, 2.01033439929228813265e-7])
+_F = np.array([1.0, 5.99832206555887937690e-1,
+               1.36929880922735805310e-1, 1.48753612908506148525e-2,
+               7.86869131145613259100e-4, 1.84631831751005468180e-5,
+               1.42151175831644588870e-7, 2.04426310338993978564e-15])
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def _poly(coef, r):
+    p = 0.
+    for i in range(len(coef) - 1, -1, -1):
+        p = p * r + coef[i]
+    return p
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def ndtri(p):
+    """!
+    @brief Standard normal quantile function (AS 241).
+    @param p <b>float</b> probability
+    """
+    if not (0. <= p <= 1.):
+        return np.nan
+    if p == 0.:
+        return -np.inf
+    if p == 1.:
+        return np.inf
+    q = p - 0.5
+    if abs(q) <= 0.425:
+        r = 0.180625 - q * q
+        return q * _poly(_A, r) / _poly(_B, r)
+    r = p if q < 0. else 1. - p
+    r = math.sqrt(-math.log(r))
+    if r <= 5.:
+        r -= 1.6
+        val = _poly(_C, r) / _poly(_D, r)
+    else:
+        r -= 5.
+        val = _poly(_E, r) / _poly(_F, r)
+    return -val if q < 0. else val
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def ndtr(x):
+    """!
+    @brief Standard normal cdf.
+    """
+    return 0.5 * math.erfc(-x / math.sqrt(2.))
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def gauss_logpdf(u, v, rho):
+    """!
+    @brief Log density of the gaussian copula.
+    @param u <b>np_1darray</b> in [0, 1]
+    @param v <b>np_1darray</b> in [0, 1]
+    @param rho <b>float</b> correlation coefficient
+    """
+    h1 = 1. - rho * rho
+    h2 = rho * rho / (2. * h1)
+    h3 = rho / h1
+    c = -0.5 * math.log(h1)
+    out = np.empty(len(u))
+    for i in range(len(u)):
+        x = ndtri(u[i])
+        y = ndtri(v[i])
+        out[i] = h3 * x * y - h2 * (x * x + y * y) + c
+    return out
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def gauss_logpdf_grad(u, v, rho):
+    """!
+    @brief Log density of the gaussian copula and its derivative wrt. rho.
+    d/drho log c = rho / s + (xy (1 + rho^2) - rho (x^2 + y^2)) / s^2
+    with s = 1 - rho^2, x = Phi^-1(u), y = Phi^-1(v)
+    @return (<b>np_1darray</b> log density, <b>np_1darray</b> derivative)
+    """
+    h1 = 1. - rho * rho
+    h2 = rho * rho / (2. * h1)
+    h3 = rho / h1
+    c = -0.5 * math.log(h1)
+    out = np.empty(len(u))
+    dout = np.empty(len(u))
+    for i in range(len(u)):
+        x = ndtri(u[i])
+        y = ndtri(v[i])
+        a = x * x + y * y
+        b = x * y
+        out[i] = h3 * b - h2 * a + c
+        dout[i] = h3 + (b * (1. + rho * rho) - rho * a) / (h1 * h1)
+    return out, dout
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def gauss_pdf(u, v, rho):
+    """!
+    @brief Density of the gaussian copula.
+    """
+    out = gauss_logpdf(u, v, rho)
+    for i in range(len(out)):
+        out[i] = math.exp(out[i])
+    return out
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def gauss_h(u, v, rho):
+    """!
+    @brief Gaussian copula h function.
+    h(u|v) = Phi((Phi^-1(u) - rho * Phi^-1(v)) / sqrt(1 - rho^2))
+    """
+    h1 = math.sqrt(1. - rho * rho)
+    out = np.empty(len(u))
+    for i in range(len(u)):
+        out[i] = ndtr((ndtri(u[i]) - rho * ndtri(v[i])) / h1)
+    return out
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def gauss_hinv(u, v, rho):
+    """!
+    @brief Inverse of the gaussian copula h function.
+    hinv(u|v) = Phi(Phi^-1(u) * sqrt(1 - rho^2) + rho * Phi^-1(v))
+    """
+    h1 = math.sqrt(1. - rho * rho)
+    out = np.empty(len(u))
+    for i in range(len(u)):
+        out[i] = ndtr(ndtri(u[i]) * h1 + rho * ndtri(v[i]))
+    return out
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def t_pdf(x, y, rho, nu, norm):
+    """!
+    @brief Density of the t copula evaluated at the student t quantiles
+    x = t_nu^{-1}(u), y = t_nu^{-1}(v).
+    @param x <b>np_1darray</b> quantiles of u
+    @param y <b>np_1darray</b> quantiles of v
+    @param rho <b>float</b> shape parameter
+    @param nu <b>float</b> degrees of freedom
+    @param norm <b>float</b> density normalizing constant
+    """
+    h1 = 1. - rho * rho
+    h3 = nu / 2. + 0.5
+    h4 = nu / 2. + 1.
+    h5 = 1. / nu
+    h6 = h5 / h1
+    out = np.empty(len(x))
+    for i in range(len(x)):
+        x2 = x[i] * x[i]
+        y2 = y[i] * y[i]
+        out[i] = norm * (1. + h5 * x2) ** h3 * (1. + h5 * y2) ** h3 / \
+            (1. + h6 * (x2 + y2 - 2. * rho * x[i] * y[i])) ** h4
+    return out
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def t_dlogpdf_drho(x, y, rho, nu):
+    """!
+    @brief Derivative of the t copula log density wrt. rho at the
+    student t quantiles x, y.
+    d/drho log c = rho / s - (nu / 2 + 1) (2 rho Q - 2 xy s) / (nu s^2 g)
+    with s = 1 - rho^2, Q = x^2 + y^2 - 2 rho xy, g = 1 + Q / (nu s)
+    """
+    h1 = 1. - rho * rho
+    h4 = nu / 2. + 1.
+    out = np.empty(len(x))
+    for i in range(len(x)):
+        b = x[i] * y[i]
+        q = x[i] * x[i] + y[i] * y[i] - 2. * rho * b
+        g = 1. + q / (nu * h1)
+        out[i] = rho / h1 - h4 * (2. * rho * q - 2. * b * h1) / (nu * h1 * h1 * g)
+    return out
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def pseudo_obs(x, out):
+    """!
+    @brief Pseudo observations rank(x) / (n + 1), written into out.
+    Ties are ranked in order of appearance (rankdata "ordinal").
+    @param x <b>np_1darray</b> samples
+    @param out <b>np_1darray</b> output buffer, len(out) == len(x)
+    """
+    n = len(x)
+    order = np.argsort(x, kind='mergesort')
+    for k in range(n):
+        out[order[k]] = (k + 1.) / (n + 1.)
+    return out
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def pseudo_obs_avg(x, out):
+    """!
+    @brief Pseudo observations rank(x) / (n + 1), written into out.
+    Tied samples get their average rank (rankdata "average").
+    @param x <b>np_1darray</b> samples
+    @param out <b>np_1darray</b> output buffer, len(out) == len(x)
+    """
+    n = len(x)
+    order = np.argsort(x, kind='mergesort')
+    i = 0
+    while i < n:
+        # sweep over the run of samples tied with x[order[i]]
+        j = i + 1
+        while j < n and x[order[j]] == x[order[i]]:
+            j += 1
+        rank = 0.5 * (i + j + 1.) / (n + 1.)
+        for k in range(i, j):
+            out[order[k]] = rank
+        i = j
+    return out
+
+
+@jit(nopython=True, cache=True, error_model='numpy')
+def pseudo_obs_avg_cols(X, out):
+    """!
+    @brief Column-wise pseudo_obs_avg() of a 2d sample array.
+    @param X <b>np_2darray</b> samples, one variable per column
+    @param out <b>np_2darray</b> output buffer, out.shape == X.shape
+    """
+    for j in range(X.shape[1]):
+        pseudo_obs_avg(X[:, j], out[:, j])
+    return out
+
+
+def as_1d(u, v):
+    """!
+    @brief Broadcast u and v against each other and flatten to
+    contiguous float64 arrays for the kernels.
+    @return (u, v, shape) flattened u, v and the broadcast shape
+    """
+    u, v = np.broadcast_arrays(np.asarray(u, dtype=np.float64),
+                               np.asarray(v, dtype=np.float64))
+    return np.ascontiguousarray(u).ravel(), np.ascontiguousarray(v).ravel(), u.shape
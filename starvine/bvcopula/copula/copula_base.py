@@ -38,6 +38,8 @@ class CopulaBase(object):
         self.theta0 = theta0
         self.name = name
         self._fittedParams = kwargs.pop("params", None)
+        # True if the copula provides the gradient of its log density
+        self._logpdfJac = False
 
     @property
     def fittedParams(self):
@@ -179,9 +181,16 @@ class CopulaBase(object):
             params0 = self.theta0
         else:
             params0 = theta0
+        # objective returns (nLL, gradient) if the copula provides the
+        # gradient of its log density, else scipy builds it by finite differences
+        if self._logpdfJac:
+            nlogLike = lambda args: self._nlogLikeJac(u, v, wgts, rotation, *args)
+        else:
+            nlogLike = lambda args: self._nlogLike(u, v, wgts, rotation, *args)
         res = \
-            minimize(lambda args: self._nlogLike(u, v, wgts, rotation, *args),
+            minimize(nlogLike,
                      x0=params0,
+                     jac=self._logpdfJac,
                      bounds=kwargs.pop("bounds", self.thetaBounds),
                      tol=kwargs.pop("tol", 1e-8),
                      method=kwargs.pop("method", 'SLSQP'))
@@ -189,15 +198,17 @@ class CopulaBase(object):
             # Fallback
             if "frank" in self.name:
                 res = \
-                    minimize(lambda args: self._nlogLike(u, v, wgts, rotation, *args),
+                    minimize(nlogLike,
                              x0=params0,
+                             jac=self._logpdfJac,
                              tol=kwargs.pop("tol", 1e-8),
                              bounds=kwargs.pop("bounds", self.thetaBounds),
                              )
             else:
                 res = \
-                    minimize(lambda args: self._nlogLike(u, v, wgts, rotation, *args),
+                    minimize(nlogLike,
                              x0=params0,
+                             jac=self._logpdfJac,
                              bounds=kwargs.pop("bounds", self.thetaBounds),
                              tol=kwargs.pop("tol", 1e-8),
                              method=kwargs.pop("altMethod", 'L-BFGS-B'))
@@ -342,8 +353,34 @@ class CopulaBase(object):
         @brief Default log likelihood func.
         """
         if wgts is None:
-            wgts = np.ones(len(u))
-        return np.sum(wgts * np.log(self._pdf(u, v, rotation, *theta)))
+            return np.sum(self._logpdf(u, v, rotation, *theta))
+        return np.sum(wgts * self._logpdf(u, v, rotation, *theta))
+
+    def _logpdf(self, u, v, rotation=0, *theta):
+        """!
+        @brief Default log density function.  May be overridden
+        by copula with a cheaper closed form log density.
+        """
+        return np.log(self._pdf(u, v, rotation, *theta))
+
+    def _nlogLikeJac(self, u, v, wgts=None, rotation=0, *theta):
+        """!
+        @brief Negative log likelihood and its gradient wrt. theta.
+        Used in MLE fitting of copula which provide _logpdfGrad().
+        @return (<b>float</b> nLL, <b>np_1darray</b> gradient)
+        """
+        logp, dlogp = self._logpdfGrad(u, v, rotation, *theta)
+        if wgts is None:
+            return -np.sum(logp), -np.sum(dlogp, axis=1)
+        return -np.sum(wgts * logp), -np.dot(dlogp, wgts)
+
+    def _logpdfGrad(self, u, v, rotation=0, *theta):
+        """!
+        @brief Log density and its gradient wrt. theta, shape (len(theta), n).
+        Copula which implement this set self._logpdfJac = True.
+        The gradient may be partly numerical, see StudentTCopula.
+        """
+        raise NotImplementedError
 
     def _ln_like(self, u, v, wgts=None, rotation=0, *theta):
         """!
@@ -6,6 +6,7 @@ from scipy import stats
 # STARVINE IMPORTS
 from starvine.bvcopula.copula.copula_base import CopulaBase
 from starvine.bvcopula.copula.mvtdstpack import mvtdstpack as mvt
+from starvine.bvcopula.copula import _kernels as kern
 
 
 class GaussCopula(CopulaBase):
@@ -24,6 +25,7 @@ class GaussCopula(CopulaBase):
         self.theta0 = (0.7,)
         self.name = 'gauss'
         self.rotation = rotation
+        self._logpdfJac = True
 
     @CopulaBase._rotPDF
     def _pdf(self, u, v, rotation=0, *theta):
@@ -34,28 +36,27 @@ class GaussCopula(CopulaBase):
         @param rotation <b>int</b>  Optional copula rotation.
         @param theta  Gaussian copula parameter
         """
-        # Constants
-        rho2 = np.power(theta[0], 2.0)
-        h1 = 1.0 - rho2
-        h2 = rho2 / (2.0 * h1)
-        h3 = theta[0] / h1
-        norm_rv = stats.norm(scale=1.0, loc=0.0)
-
-        # UU = CheckBounds(u);
-        # VV = CheckBounds(v);
-        # u and v must be on the unit square ie. in [0, 1]
-        UU = np.asarray(u)  # TODO: check bounds
-        VV = np.asarray(v)
+        UU, VV, shape = kern.as_1d(u, v)
+        return kern.gauss_pdf(UU, VV, float(np.squeeze(theta[0]))).reshape(shape)
 
-        # Output storage
-        p = np.zeros(UU.size)
-
-        # Percentile point function eval
-        x = norm_rv.ppf(UU)
-        y = norm_rv.ppf(VV)
+    @CopulaBase._rotPDF
+    def _logpdf(self, u, v, rotation=0, *theta):
+        """!
+        @brief Log density of the Gauss copula.  Evaluated directly
+        rather than as log(pdf).
+        """
+        UU, VV, shape = kern.as_1d(u, v)
+        return kern.gauss_logpdf(UU, VV, float(np.squeeze(theta[0]))).reshape(shape)
 
-        p = np.exp(h3 * x * y - h2 * (np.power(x, 2) + np.power(y, 2))) / np.sqrt(h1)
-        return p
+    @CopulaBase._rotPDF
+    def _logpdfGrad(self, u, v, rotation=0, *theta):
+        """!
+        @brief Log density of the Gauss copula and its analytic
+        gradient wrt. theta.
+        """
+        UU, VV, shape = kern.as_1d(u, v)
+        logp, dlogp = kern.gauss_logpdf_grad(UU, VV, float(np.squeeze(theta[0])))
+        return logp.reshape(shape), dlogp.reshape((1,) + shape)
 
     @CopulaBase._rotCDF
     def _cdf(self, u, v, rotation=0, *theta):
@@ -92,19 +93,12 @@ class GaussCopula(CopulaBase):
         kTs = kT / abs(kT)
         kTM = 1 if kTs < 0 else 0
 
-        h1 = np.sqrt(1.0 - np.power(np.asarray(theta[0]), 2))
-        dist = stats.norm(scale=1.0, loc=0.0)
-
         UU = np.asarray(kTM + kTs * u)  # TODO: check input bounds
         VV = np.asarray(v)
 
-        # inverse CDF yields quantiles
-        x = dist.ppf(UU)
-        y = dist.ppf(VV)
-
         # eval H function
-        uu = dist.cdf((x - theta[0] * y) / h1)
-        return uu
+        UU, VV, shape = kern.as_1d(UU, VV)
+        return kern.gauss_h(UU, VV, float(np.squeeze(theta[0]))).reshape(shape)
 
     @CopulaBase._rotHinv
     def _hinv(self, v, u, rotation=0, *theta):
@@ -116,19 +110,12 @@ class GaussCopula(CopulaBase):
         kTs = kT / abs(kT)
         kTM = 1 if kTs < 0 else 0
 
-        h1 = np.sqrt(1.0 - np.power(np.asarray(theta[0]), 2))
-        dist = stats.norm(scale=1.0, loc=0.0)
-
         UU = np.asarray(kTM + kTs * u)  # TODO: check input bounds
         VV = np.asarray(v)
 
-        # inverse CDF yields quantiles
-        x = dist.ppf(UU)
-        y = dist.ppf(VV)
-
-        # eval H function
-        uu = dist.cdf(x * h1 + theta[0] * y)
-        return uu
+        # eval inverse H function
+        UU, VV, shape = kern.as_1d(UU, VV)
+        return kern.gauss_hinv(UU, VV, float(np.squeeze(theta[0]))).reshape(shape)
 
     @CopulaBase._rotGen
     def _gen(self, t, *theta):
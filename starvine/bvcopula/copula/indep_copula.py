@@ -14,7 +14,18 @@ class IndepCopula(CopulaBase):
         self.thetaBounds = ((-np.inf, np.inf),)
 
     def _pdf(self, u, v, rotation=0, *args):
-        return np.ones(len(u))
+        return np.ones(np.broadcast(u, v).shape)
+
+    def _logpdf(self, u, v, rotation=0, *args):
+        # internal use only: read-only zero-copy view, no per-call allocation
+        return np.broadcast_to(np.float64(0.0), np.broadcast(u, v).shape)
+
+    def _logLike(self, u, v, wgts=None, rotation=0, *args):
+        """!
+        @brief Log likelihood of the independence copula is identically zero.
+        Skips the log() and sum over the samples.
+        """
+        return 0.0
 
     def _cdf(self, u, v, rotation=0, *args):
         return u * v
@@ -25,5 +36,14 @@ class IndepCopula(CopulaBase):
     def _hinv(self, u, v, rotation=0, *args):
         return v
 
-    def _gen(self, t, rotation=0, *theta):
-        return -np.log(t)
+    def _gen(self, t, rotation=0, *theta, **kwargs):
+        """!
+        @brief Generator of the independence copula, -log(t).
+        Negated in place, so only the log(t) result is allocated.
+        @param out <b>np_1darray</b> (optional) output buffer, may be t itself
+        """
+        out = kwargs.pop("out", None)
+        if out is None and np.ndim(t) == 0:
+            return -np.log(t)
+        out = np.log(t, out=out)
+        return np.negative(out, out=out)
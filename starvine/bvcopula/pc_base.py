@@ -7,9 +7,9 @@ import numpy as np
 from six import iteritems
 from scipy.stats import kendalltau, spearmanr, pearsonr
 from scipy.stats import gaussian_kde
-from scipy.stats.mstats import rankdata
+from scipy.stats import rankdata
 # NUMBA
-from numba import jit
+from numba import jit, prange
 # COPULA IMPORTS
 from starvine.bvcopula.copula_factory import Copula
 
@@ -35,6 +35,8 @@ class PairCopula(object):
         @param y  <b>np_1darray</b> second marginal data set
         @param weights <b>np_1darray</b> (optional) data weights
                normalized or unormalized weights accepted
+        @param ranks <b>tuple</b> (optional) precomputed (u, v) rank
+               transformed x and y.  Skips the default rank transform.
         Note: len(u) == len(v) == len(weights)
         """
         self.copulaModel, self.copulaParams = None, (None, None, )
@@ -50,7 +52,11 @@ class PairCopula(object):
         self.setTrialCopula(kwargs.pop("family", {}))
         # default data ranking method
         self.rank_method = kwargs.pop("rankMethod", 0)
-        self.rank(self.rank_method)
+        ranks = kwargs.pop("ranks", None)
+        if ranks is not None and self.rank_method == 0 and resample == 0:
+            self.UU, self.VV = ranks
+        else:
+            self.rank(self.rank_method)
 
     def resample(self, px_size=10, jitter=1e-12):
         """!
@@ -351,3 +357,100 @@ def jit_empKc(UU, VV):
     x2 = np.sort(z)
     f2 = np.linspace(0.0, 1.0, len(z))
     return x2, f2
+
+
+@jit(nopython=True, cache=True)
+def jit_ktau(x, y):
+    """!
+    @brief JITed Kendall's tau-b.  Uses Knight's (1966) merge sort
+    algorithm: O(n log n) in the number of samples.
+    Ties are accounted for as in the tau-b statistic.
+    @param x <b>np_1darray</b>
+    @param y <b>np_1darray</b>
+    @return <b>float</b> Kendall's tau
+    """
+    n = len(x)
+    # sort by x, break ties in x by y
+    perm = np.argsort(y, kind='mergesort')
+    perm = perm[np.argsort(x[perm], kind='mergesort')]
+    xs = x[perm]
+    ys = y[perm]
+    n0 = 0.5 * n * (n - 1.)
+    # pairs tied in x (n1) and tied in both x and y (n3)
+    n1, n3 = 0., 0.
+    i = 0
+    while i < n:
+        j = i + 1
+        while j < n and xs[j] == xs[i]:
+            j += 1
+        n1 += 0.5 * (j - i) * (j - i - 1.)
+        k = i
+        while k < j:
+            m = k + 1
+            while m < j and ys[m] == ys[k]:
+                m += 1
+            n3 += 0.5 * (m - k) * (m - k - 1.)
+            k = m
+        i = j
+    # bottom up merge sort on y, count the swaps (discordant pairs)
+    swaps = 0
+    buf = np.empty_like(ys)
+    width = 1
+    while width < n:
+        lo = 0
+        while lo < n - width:
+            mid = lo + width
+            hi = min(lo + 2 * width, n)
+            a, b, k = lo, mid, lo
+            while a < mid and b < hi:
+                if ys[b] < ys[a]:
+                    buf[k] = ys[b]
+                    swaps += mid - a
+                    b += 1
+                else:
+                    buf[k] = ys[a]
+                    a += 1
+                k += 1
+            while a < mid:
+                buf[k] = ys[a]
+                a += 1
+                k += 1
+            while b < hi:
+                buf[k] = ys[b]
+                b += 1
+                k += 1
+            ys[lo:hi] = buf[lo:hi]
+            lo += 2 * width
+        width *= 2
+    # pairs tied in y (n2), ys is now sorted
+    n2 = 0.
+    i = 0
+    while i < n:
+        j = i + 1
+        while j < n and ys[j] == ys[i]:
+            j += 1
+        n2 += 0.5 * (j - i) * (j - i - 1.)
+        i = j
+    denom = np.sqrt((n0 - n1) * (n0 - n2))
+    if denom == 0.:
+        return np.nan
+    return (n0 - n1 - n2 + n3 - 2. * swaps) / denom
+
+
+@jit(nopython=True, cache=True)
+def jit_ktau_submatrix(X, cols):
+    """!
+    @brief Kendall's tau matrix between the columns cols of X.
+    Only the upper triangle is evaluated, the diagonal is left at zero.
+    @param X <b>np_2darray</b> shape (n samples, d variables)
+    @param cols <b>np_1darray</b> int64 column indices, sets the row/col order
+    @return <b>np_2darray</b> shape (len(cols), len(cols)) symmetric tau matrix
+    """
+    d = len(cols)
+    T = np.zeros((d, d))
+    for i in range(d):
+        for j in range(i + 1, d):
+            tau = jit_ktau(X[:, cols[i]], X[:, cols[j]])
+            T[i, j] = tau
+            T[j, i] = tau
+    return T
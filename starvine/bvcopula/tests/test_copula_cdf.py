@@ -8,6 +8,8 @@ from starvine.bvcopula.copula.frank_copula import FrankCopula
 from starvine.bvcopula.copula.gumbel_copula import GumbelCopula
 from starvine.bvcopula.copula.clayton_copula import ClaytonCopula
 from starvine.bvcopula.copula.indep_copula import IndepCopula
+from starvine.bvcopula.copula.mvtdstpack import mvtdstpack as mvt
+from scipy import stats
 #
 import unittest
 import numpy as np
@@ -28,6 +30,19 @@ class TestCopulaCDF(unittest.TestCase):
         cdf_max = t_copula.cdf(u, v, *[0.7, 10])
         self.assertAlmostEqual(cdf_max[0], 1.0)
 
+    def testTCopulaCDFGaussLimit(self):
+        # past _gaussDofLimit the t copula cdf is integrated as a normal
+        t_copula = StudentTCopula()
+        u = np.linspace(0.02, 0.98, 15)
+        u, v = [uv.ravel() for uv in np.meshgrid(u, u)]
+        zeros, inFin = np.zeros(2), np.zeros(2, dtype='int')
+        for rho in [-0.8, 0.3, 0.9]:
+            for nu in [t_copula._gaussDofLimit + 1, 5 * t_copula._gaussDofLimit]:
+                cdf = t_copula._cdf(u, v, 0, rho, nu)
+                cdf_t = np.array([mvt.mvtdst(nu, zeros, stats.t.ppf([up, vp], nu),
+                                             inFin, rho, zeros)[1] for up, vp in zip(u, v)])
+                self.assertTrue(np.max(np.abs(cdf - cdf_t)) < 0.4 / nu)
+
     def testGaussCopulaCDF(self):
         gauss_copula = GaussCopula()
         u, v = np.ones(1) - 1e-9, np.ones(1) - 1e-9
@@ -63,3 +78,32 @@ class TestCopulaCDF(unittest.TestCase):
         u, v = np.ones(1), np.ones(1)
         cdf_max = indep_copula.cdf(u, v)
         self.assertAlmostEqual(cdf_max[0], 1.0)
+
+    def testIndepCopulaPDF(self):
+        indep_copula = IndepCopula()
+        u, v = np.random.uniform(0, 1, 50), np.random.uniform(0, 1, 50)
+        pdf = indep_copula.pdf(u, v)
+        self.assertTrue(np.all(pdf == 1.0))
+        # the public pdf may be modified in place
+        pdf *= 2.0
+        self.assertEqual(indep_copula.pdf(u[:, None], v[None, :]).shape, (50, 50))
+        self.assertEqual(indep_copula._logpdf(0.5, v).shape, (50,))
+        self.assertTrue(np.all(indep_copula._logpdf(u, v) == 0.0))
+        # log likelihood short circuits to zero, weighted or not
+        self.assertEqual(indep_copula._logLike(u, v), 0.0)
+        self.assertEqual(indep_copula._nlogLike(u, v, u, 0), 0.0)
+
+    def testIndepCopulaGen(self):
+        indep_copula = IndepCopula()
+        t = np.random.uniform(0.01, 1, 50)
+        ref = -np.log(t)
+        self.assertAlmostEqual(indep_copula._gen(0.3), -np.log(0.3))
+        self.assertTrue(np.allclose(indep_copula._gen(t), ref))
+        # result is written to the out buffer
+        buf = np.empty_like(t)
+        self.assertIs(indep_copula._gen(t, out=buf), buf)
+        self.assertTrue(np.allclose(buf, ref))
+        # out may alias the input
+        tt = t.copy()
+        self.assertIs(indep_copula._gen(tt, out=tt), tt)
+        self.assertTrue(np.allclose(tt, ref))
@@ -0,0 +1,79 @@
+##
+# \brief Test JITed gauss and t copula kernels against scipy
+from __future__ import print_function, division
+from starvine.bvcopula.copula import _kernels as kern
+from starvine.bvcopula.copula.gauss_copula import GaussCopula
+from starvine.bvcopula.copula.t_copula import StudentTCopula
+from scipy import stats
+from scipy.stats import rankdata
+from scipy.optimize import approx_fprime
+from scipy.special import gammaln
+import unittest
+import numpy as np
+np.random.seed(123)
+
+
+class TestCopulaKernels(unittest.TestCase):
+    def setUp(self):
+        self.u = np.random.uniform(1e-9, 1 - 1e-9, 2000)
+        self.v = np.random.uniform(1e-9, 1 - 1e-9, 2000)
+
+    def testNdtri(self):
+        p = np.concatenate((self.u, np.logspace(-300, -1, 200), [0., 1.]))
+        ndtri = np.array([kern.ndtri(pp) for pp in p])
+        self.assertTrue(np.allclose(ndtri, stats.norm.ppf(p), rtol=1e-13, atol=0))
+        self.assertTrue(np.isnan(kern.ndtri(1.5)))
+
+    def testGaussKernels(self):
+        rho = -0.6
+        x, y = stats.norm.ppf(self.u), stats.norm.ppf(self.v)
+        h1 = 1. - rho ** 2
+        logpdf = -0.5 * np.log(h1) + (rho * x * y - 0.5 * rho ** 2 * (x ** 2 + y ** 2)) / h1
+        self.assertTrue(np.allclose(kern.gauss_logpdf(self.u, self.v, rho), logpdf))
+        self.assertTrue(np.allclose(kern.gauss_pdf(self.u, self.v, rho), np.exp(logpdf)))
+        h = stats.norm.cdf((x - rho * y) / np.sqrt(h1))
+        self.assertTrue(np.allclose(kern.gauss_h(self.u, self.v, rho), h))
+        # hinv is the inverse of h
+        self.assertTrue(np.allclose(kern.gauss_hinv(h, self.v, rho), self.u))
+
+    def testTPdf(self):
+        rho, nu = 0.5, 5.
+        x, y = stats.t.ppf(self.u, nu), stats.t.ppf(self.v, nu)
+        # bivariate t density over the product of the marginal t densities
+        norm = np.exp(gammaln(nu / 2. + 1.) + gammaln(nu / 2.) - 2. * gammaln(nu / 2. + 0.5)) \
+            / np.sqrt(1. - rho ** 2)
+        pdf = stats.multivariate_t(shape=[[1., rho], [rho, 1.]], df=nu).pdf(np.array([x, y]).T) \
+            / stats.t.pdf(x, nu) / stats.t.pdf(y, nu)
+        self.assertTrue(np.allclose(kern.t_pdf(x, y, rho, nu, norm), pdf))
+
+    def testPseudoObs(self):
+        n = len(self.u)
+        out = np.empty(n)
+        self.assertTrue(np.allclose(kern.pseudo_obs(self.u, out), rankdata(self.u) / (n + 1)))
+        # heavily tied samples
+        x = np.random.randint(0, 20, n).astype(float)
+        self.assertTrue(np.allclose(kern.pseudo_obs(x, out),
+                                    rankdata(x, method="ordinal") / (n + 1)))
+        self.assertTrue(np.allclose(kern.pseudo_obs_avg(x, out), rankdata(x) / (n + 1)))
+        X = np.asfortranarray(np.column_stack((x, self.u, self.v)))
+        self.assertTrue(np.allclose(kern.pseudo_obs_avg_cols(X, np.empty_like(X)),
+                                    rankdata(X, axis=0) / (n + 1)))
+
+    def testNlogLikeJac(self):
+        # analytic nLL gradients against finite differences
+        wgts = np.random.uniform(0, 1, len(self.u))
+        tRot = StudentTCopula()
+        tRot.setRotation(1)
+        for copula, theta in [(GaussCopula(), [0.5]), (GaussCopula(1), [0.3]),
+                              (StudentTCopula(), [0.6, 8.]), (StudentTCopula(), [-0.3, 25.]),
+                              (tRot, [0.4, 10.])]:
+            for w in [None, wgts]:
+                nll, jac = copula._nlogLikeJac(self.u, self.v, w, 0, *theta)
+                fd = approx_fprime(np.array(theta),
+                                   lambda p: copula._nlogLike(self.u, self.v, w, 0, *p), 1e-6)
+                self.assertAlmostEqual(nll, copula._nlogLike(self.u, self.v, w, 0, *theta))
+                self.assertTrue(np.allclose(jac, fd, rtol=1e-4, atol=1e-3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+##
+# \brief Test JITed kendall's tau against scipy
+from __future__ import print_function, division
+from starvine.bvcopula.pc_base import jit_ktau, jit_ktau_submatrix
+from scipy.stats import kendalltau
+import unittest
+import numpy as np
+import os
+pwd_ = os.getcwd()
+dataDir = pwd_ + "/tests/data/"
+np.random.seed(123)
+
+
+class TestJitKtau(unittest.TestCase):
+    def testJitKtauStocks(self):
+        stocks = np.loadtxt(dataDir + 'stocks.csv', delimiter=',')
+        x = stocks[:, 0]
+        y = stocks[:, 1]
+        self.assertAlmostEqual(jit_ktau(x, y), kendalltau(x, y)[0], 12)
+
+    def testJitKtauTies(self):
+        # integer valued samples produce many ties in both x and y
+        x = np.random.randint(0, 5, 500).astype(float)
+        y = x + np.random.randint(0, 3, 500).astype(float)
+        self.assertAlmostEqual(jit_ktau(x, y), kendalltau(x, y)[0], 12)
+        self.assertAlmostEqual(jit_ktau(x, -y), kendalltau(x, -y)[0], 12)
+
+    def testJitKtauConstant(self):
+        x = np.ones(10)
+        y = np.arange(10.)
+        self.assertTrue(np.isnan(jit_ktau(x, y)))
+
+    def testJitKtauSubmatrix(self):
+        stocks = np.asfortranarray(np.loadtxt(dataDir + 'stocks.csv', delimiter=','))
+        cols = np.array([4, 0, 6], dtype=np.int64)
+        T = jit_ktau_submatrix(stocks, cols)
+        for i in range(len(cols)):
+            self.assertEqual(T[i, i], 0.)
+            for j in range(len(cols)):
+                if i != j:
+                    self.assertAlmostEqual(T[i, j], kendalltau(stocks[:, cols[i]],
+                                                               stocks[:, cols[j]])[0], 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
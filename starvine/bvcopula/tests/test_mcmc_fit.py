@@ -2,7 +2,7 @@
 # \brief Tests mcmc estimation of copula paramters
 from __future__ import print_function, division
 import unittest
-from scipy.stats.mstats import rankdata
+from scipy.stats import rankdata
 # COPULA IMPORTS
 from starvine.bvcopula.copula.gauss_copula import GaussCopula as gc
 import numpy as np
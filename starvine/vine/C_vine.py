@@ -6,11 +6,11 @@
 # be abs(empirical kendall's tau) correlation coefficients in this
 # implementation.
 #
+from multiprocessing import Pool
 from starvine.vine.base_vine import BaseVine
-from pandas import DataFrame
+from pandas import DataFrame, Index
 from scipy.optimize import minimize
 import networkx as nx
-from starvine.bvcopula import pc_base as pc
 import numpy as np
 from six import iteritems
 from starvine.vine.tree import Vtree
@@ -74,6 +74,10 @@ class Cvine(BaseVine):
     """
     def __init__(self, data, dataWeights=None, **kwargs):
         super(Cvine, self).__init__(data, dataWeights, **kwargs)
+        # (optional) labels of np_2darray data columns
+        self.labels = kwargs.get("labels", None)
+        # (optional) number of processes used to fit the edges of each tree
+        self.procs = kwargs.get("procs", 1)
         self.nLevels = int(data.shape[1] - 1)
         self.vine = []
 
@@ -84,8 +88,9 @@ class Cvine(BaseVine):
         build all tree levels.
         """
         # 0th tree build
-        tree0 = Ctree(self.data, lvl=0, trial_copula=self.trial_copula_dict)
-        tree0.seqCopulaFit()
+        tree0 = Ctree(self.data, lvl=0, trial_copula=self.trial_copula_dict,
+                      labels=self.labels)
+        tree0.seqCopulaFit(procs=self.procs)
         self.vine.append(tree0)
         # build all other trees
         self.buildDeepTrees()
@@ -100,7 +105,7 @@ class Cvine(BaseVine):
                       lvl=level,
                       parentTree=self.vine[level - 1],
                       trial_copula=self.trial_copula_dict)
-        treeT.seqCopulaFit()
+        treeT.seqCopulaFit(procs=self.procs)
         if self.nLevels > 1:
             self.vine.append(treeT)
         if level < self.nLevels - 1:
@@ -117,60 +122,73 @@ class Ctree(Vtree):
     def __init__(self, data, lvl=None, **kwargs):
         """!
         @brief A single tree within vine.
-        @param data <b>DataFrame</b>  multivariate data set. Each data
-                                      column will be assigned to a node.
+        @param data <b>DataFrame</b> or <b>np_2darray</b> multivariate data set.
+                                      Each data column will be assigned to a node.
         @param lvl <b>int</b>: tree level in the vine
         @param weights <b>DataFrame</b>: (optional) data weights
         @param labels <b>list</b> of <b>str</b> or <b>ints</b>: (optional) data labels
         """
         super(Ctree, self).__init__(data, lvl, **kwargs)
 
-    def seqCopulaFit(self):
+    def seqCopulaFit(self, procs=1):
         """!
         @brief Iterate through all edges in tree, fit copula models
         at each edge.  This is a sequential fitting operation.
 
         See simultaneousCopulaFit() for a tree-wide simulltaneous
         parameter estimation.
+        @param procs <b>int</b> (optional) number of processes.  The edge
+            copula fits are independent and are spread over a process
+            pool if procs > 1 and the tree has more than 2 edges.
         """
-        for u, v, data in self.tree.edges(data=True):
-            data["pc"].copulaTournament()
+        if procs > 1 and len(self.edges) > 2:
+            pool = Pool(procs)
+            try:
+                fitResults = pool.map(_fitEdgeCopula, [edge.pc for edge in self.edges])
+            finally:
+                pool.close()
+                pool.join()
+            for edge, fitResult in zip(self.edges, fitResults):
+                # copy fit results back, the edge keeps its own pair copula
+                edge.pc.copulaModel, edge.pc.copulaParams, edge.pc.copulaBank, \
+                    edge.pc.empKTau_, edge.pc.pval_ = fitResult
+        else:
+            for edge in self.edges:
+                edge.pc.copulaTournament()
+        for edge in self.edges:
+            edge.pcmodel = edge.pc.copulaModel
         self._initTreeParamMap()
 
-    def treeNLLH(self, treeCopulaParams=None):
+    def treeNLLH(self, treeCopulaParams=None, jac=False):
         """!
         @brief Compute this tree's negative log likelihood.
         For C-trees this is just the sum of copula-log-likelihoods over all
         node-pairs.
         @param treeCopulaParams <b>np_1darray</b> Copula parameter array.
         Contains parameters for all PCC in the tree.
+        @param jac <b>bool</b> (optional) also return the gradient of the
+        tree negative log likelihood wrt. treeCopulaParams
 
         @param paramMap  Maps edges to parameter len and location in
         treeCopulaParams
         {[u, v]: (start, Params_len_0), [u, v]: (start, Params_len), ...}
         """
-        if not treeCopulaParams:
+        if treeCopulaParams is None or len(treeCopulaParams) == 0:
             if not hasattr(self, "treeCopulaParams"):
                 raise RuntimeError("Sequential copula model fitting must be performed first.")
             treeCopulaParams = self.treeCopulaParams
-        nLL = 0
-        for u, v, data in self.tree.edges(data=True):
-            nLL += \
-                self.tree.adj[u][v]["pc"].copulaModel.\
-                _nlogLike(self.tree.node[u]["data"].values,
-                          self.tree.node[v]["data"].values,
-                          0,
-                          *treeCopulaParams[data["paramMap"][0]: data["paramMap"][1]])
-        return nLL
+        edgeNLLH, nLLJac = self._edgeNLLH(treeCopulaParams, jac)
+        if jac:
+            return np.sum(edgeNLLH), nLLJac
+        return np.sum(edgeNLLH)
 
     def evalH(self):
         """!
         @brief Define nodes of the T+1 level tree.  Use the conditional distribution
         (h()) to obtain marginal distributions at the next tree level.
         """
-        for u, v, data in self.tree.edges(data=True):
-            self.tree.adj[u][v]["h-dist"] = data["pc"].copulaModel.h
-            self.tree.adj[u][v]["hinv-dist"] = data["pc"].copulaModel.hinv
+        for edge in self.edges:
+            edge.h, edge.hinv = edge.pcmodel.h, edge.pcmodel.hinv
         return self._evalH()
 
     # ---------------------------- PRIVATE METHODS ------------------------------ #
@@ -184,28 +202,22 @@ class Ctree(Vtree):
         since if we have nT variables in the top level tree
         the number of _unique_ C-trees is == nT.
 
-        @return <b>nd_array</b>: (nT-1, 3) shape array with PCC pairs
-                Each row is a len 3 tuple: (rootNodeID, nodeID, kTau)
+        @return <b>list</b>: nT-1 PCC pairs
+                Each entry is a len 4 tuple: (nodeID, rootNodeID, kTau, PairCopula)
         """
-        trialKtauSum = np.zeros(len(self.tree.nodes()))
-        trialPairings = []
-        # Generate all possible node pairings
-        for i, rootNodeID in enumerate(self.tree.nodes()):
-            trialPairings.append([])
-            for nodeID in self.tree.nodes():
-                # iterate though all child nodes,
-                # root dataset cannot be paired with itself
-                if nodeID != rootNodeID:
-                    trialPair = pc.PairCopula(self.tree.node[nodeID]["data"].values,
-                                              self.tree.node[rootNodeID]["data"].values)
-                    trialKtau, trialP = trialPair.empKTau()
-                    trialKtauSum[i] += abs(trialKtau)
-                    trialPairings[i].append((nodeID, rootNodeID, trialKtau))
+        nodeIDs = self.nodeIDs()
+        # tau is symmetric: each unordered node pair is evaluated once
+        ktauMatrix = self._ktauMatrix(nodeIDs)
+        trialKtauSum = np.abs(ktauMatrix).sum(axis=1)
+        for i in range(len(nodeIDs)):
             print("Tree level: %d, configuration: %d, Ktau Metric: %f" % (self.level, i, trialKtauSum[i]))
-        bestPairingIndex = np.argmax(np.abs(trialKtauSum))
+        bestPairingIndex = int(np.argmax(trialKtauSum))
         print(" === Configuration %d selected === " % (bestPairingIndex))
-        self.rootNodeID = trialPairings[bestPairingIndex][0][1]
-        return trialPairings[bestPairingIndex]
+        self.rootNodeID = nodeIDs[bestPairingIndex]
+        # pair copulas are only built for the selected edges
+        return [(nodeID, self.rootNodeID, ktauMatrix[j, bestPairingIndex],
+                 self._pairCopula(nodeID, self.rootNodeID))
+                for j, nodeID in enumerate(nodeIDs) if j != bestPairingIndex]
 
     def _evalH(self):
         """!
@@ -214,30 +226,70 @@ class Ctree(Vtree):
         @return <b>DataFame</b> : conditional distribution at tree edges.
         """
         # TODO: Establish linkage between tree levels
-        condData = DataFrame()
-        for u, v, data in self.tree.edges(data=True):
+        condLabels, condCols = [], []
+        for edge in self.edges:
             # eval h() of pair-copula model at current edge
             # use rank transformed data as input to conditional dist
-            # identify rootID
+            # identify rootID.  Compare integer column indices: an identity
+            # check on labels only holds for interned strings and small ints
             rootID = self.rootNodeID
-            if u is not rootID:
-                nonRootID = u
-                nonRootData = data["pc"].UU
-                rootData = data["pc"].VV
+            if self._colIdx[edge.i] != self._colIdx[rootID]:
+                nonRootID = edge.i
+                nonRootData = edge.pc.UU
+                rootData = edge.pc.VV
             else:
-                nonRootID = v
-                nonRootData = data["pc"].VV
-                rootData = data["pc"].UU
-            condData[(nonRootID, rootID)] = data["h-dist"](data["pc"].VV,
-                                                           data["pc"].UU)
-        return condData
-
-    def _getEdgeCopulaParams(self, u, v):
+                nonRootID = edge.j
+                nonRootData = edge.pc.VV
+                rootData = edge.pc.UU
+            condLabels.append((nonRootID, rootID))
+            condCols.append(edge.h(edge.pc.VV, edge.pc.UU))
+        # keep the (nonRootID, rootID) labels as flat tuples, column
+        # assignment by tuple key would split int labels over several columns
+        return DataFrame(np.column_stack(condCols),
+                         columns=Index(condLabels, tupleize_cols=False))
+
+    def _edgeNLLH(self, treeCopulaParams, jac=False):
+        """!
+        @brief Negative log likelihood of every edge in the tree.
+        Edge copula parameters only enter their own edge's term, so
+        the gradient is built one edge at a time: from the edge copula's
+        _logpdfGrad() if it provides one, else by forward differences on
+        that edge alone.
+        @param treeCopulaParams <b>np_1darray</b> Copula parameter array.
+        @param jac <b>bool</b> (optional) compute the gradient
+        @return (<b>np_1darray</b> edge nLLH, <b>np_1darray</b> gradient or None)
+        """
+        treeCopulaParams = np.asarray(treeCopulaParams, dtype=np.float64)
+        edgeNLLH = np.zeros(self._edgeUV.shape[0])
+        nLLJac = np.zeros(len(treeCopulaParams)) if jac else None
+        for e, edge in enumerate(self.edges):
+            copula = edge.pcmodel
+            start, end = edge.paramMap
+            theta = treeCopulaParams[start:end]
+            uu, vv = self._edgeUV[e]
+            if jac and copula._logpdfJac:
+                edgeNLLH[e], nLLJac[start:end] = copula._nlogLikeJac(uu, vv, None, 0, *theta)
+                continue
+            edgeNLLH[e] = copula._nlogLike(uu, vv, None, 0, *theta)
+            if not jac:
+                continue
+            for k in range(end - start):
+                step = np.sqrt(np.finfo(float).eps) * max(1.0, abs(theta[k]))
+                if theta[k] + step >= copula.thetaBounds[k][1]:
+                    step = -step
+                thetaK = theta.copy()
+                thetaK[k] += step
+                nLLJac[start + k] = \
+                    (copula._nlogLike(uu, vv, None, 0, *thetaK) - edgeNLLH[e]) / step
+        return edgeNLLH, nLLJac
+
+    def _getEdgeCopulaParams(self, edge):
         """!
         @brief Get copula paramters of particular edge in tree.
+        @param edge <b>_Edge</b> tree edge
         @returns <b>np_1darray</b> Copula parameters of edge
         """
-        cp = self.tree.adj[u][v]["pc"].copulaParams
+        cp = edge.pc.copulaParams
         if cp is not None:
             return cp
         else:
@@ -250,15 +302,29 @@ class Ctree(Vtree):
         """
         currentMarker = 0
         self.treeCopulaParams = []
-        edgeList = self.tree.edges(data=True)
-        for u, v, data in edgeList:
-            edgeParams = self._getEdgeCopulaParams(u, v)
+        # stack the rank data (UU, VV) the edge copulas were fit on into a
+        # single (nEdges, 2, nSamples) array
+        self._edgeUV = np.array([(edge.pc.UU, edge.pc.VV) for edge in self.edges],
+                                dtype=np.float64)
+        for edge in self.edges:
+            edgeParams = self._getEdgeCopulaParams(edge)
             self.treeCopulaParams.append(edgeParams[1])
             nEdgeParams = len(edgeParams[1])
-            self.tree.adj[u][v]["paramMap"] = \
-                [currentMarker, currentMarker + nEdgeParams]
+            edge.paramMap = [currentMarker, currentMarker + nEdgeParams]
             currentMarker += nEdgeParams
         self.treeCopulaParams = [item for sublist in self.treeCopulaParams
                                  for item in sublist]
         self.treeCopulaParams = np.array(self.treeCopulaParams)
         return self.treeCopulaParams
+
+
+def _fitEdgeCopula(pairCopula):
+    """!
+    @brief Process pool worker.  Fits the copula of a single tree edge.
+    @param pairCopula <b>PairCopula</b>
+    @return <b>tuple</b> (copulaModel, copulaParams, copulaBank, empKTau_, pval_)
+            fit results of the pair copula
+    """
+    pairCopula.copulaTournament()
+    return (pairCopula.copulaModel, pairCopula.copulaParams, pairCopula.copulaBank,
+            pairCopula.empKTau_, pairCopula.pval_)
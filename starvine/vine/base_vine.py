@@ -57,14 +57,24 @@ class BaseVine(object):
         simulatneous MLE estimation of PCC model parameters.
         Loops through all tree levels and sums all NLL.
         @param vineParams <b>np_array</b>  Flattened array of all copula parametrs in vine
+        @param jac <b>bool</b> (optional) also return the gradient
+            of the vine NLL wrt. vineParams
         """
+        jac = kwargs.pop("jac", False)
         if not any(vineParams):
             self._initVineParams()
+            vineParams = np.concatenate(self.vineParams)
         self.nLLH = 0.
+        nLLJac = np.zeros(len(vineParams))
         for lvl, tree in enumerate(self.vine):
-            treeNLLH = tree.treeNLLH(vineParams[self.vineParamsMap[lvl]:
-                                                self.vineParamsMap[lvl + 1]])
+            lvlParams = slice(self.vineParamsMap[lvl], self.vineParamsMap[lvl + 1])
+            if jac:
+                treeNLLH, nLLJac[lvlParams] = tree.treeNLLH(vineParams[lvlParams], jac=True)
+            else:
+                treeNLLH = tree.treeNLLH(vineParams[lvlParams])
             self.nLLH += treeNLLH
+        if jac:
+            return self.nLLH, nLLJac
         return self.nLLH
 
     def _initVineParams(self):
@@ -78,10 +88,13 @@ class BaseVine(object):
         """!
         @brief Simulataneously estimate all copula paramters in the
         vine by MLE.  Uses SLSQP method by default.
+        The objective returns the vine NLL and its gradient together
+        (jac=True) so each optimizer step costs a single pass over the vine.
         """
         self._initVineParams()
-        params0 = np.array(self.vineParams).flatten()
-        self.fittedParams = minimize(self.vineNLLH, params0, args=(),
+        params0 = np.concatenate(self.vineParams)
+        self.fittedParams = minimize(lambda p: self.vineNLLH(p, jac=True),
+                                     params0, args=(), jac=True,
                                      method=kwargs.pop("method", "SLSQP"),
                                      tol=kwargs.pop("tol", 1e-5))
 
@@ -107,43 +120,38 @@ class BaseVine(object):
 
         # obtain edge from last tree in vine
         current_tree = self.vine[-1]
-        n0, n1 = list(current_tree.tree.edges())[0]
-        edge_info = current_tree.tree[n0][n1]
+        n0, n1, edge = next(current_tree._orderedEdges())
 
         # sample from edge of last tree
-        u_n1 = edge_info["hinv-dist"](u_n0, u_n1)
+        u_n1 = edge.hinv(u_n0, u_n1)
         edge_sample = {n0: u_n0, n1: u_n1}
         # matrixPairPlot(pd.DataFrame(edge_sample), savefig="c_test/tree_1_edge_sample.png")
 
-        # store edge sample inside graph data struct
-        current_tree.tree[n0][n1]['sample'] = edge_sample
+        # store edge sample on the tree edge
+        edge.sample = edge_sample
 
         # Three nodes in the above tree that contributed to the
         # construction of this edge.
         # Node labels according to  (prev_n0|prev_n2), (prev_n1|prev_n2)
         # Only applicable if the vine has atleast 2 levels
         if len(self.vine) > 1:
-            prev_n0, prev_n1, prev_n2 = edge_info['one-fold']
+            prev_n0, prev_n1, prev_n2 = edge.oneFold
 
             ## \brief Entrance to starvine.vine.tree.Vtree._sampleEdge()
             current_tree._sampleEdge(prev_n0, prev_n2, n0, n1, n, self.vine)
             current_tree._sampleEdge(prev_n1, prev_n2, n0, n1, n, self.vine)
 
         sample_result = {}
-        tree_0 = self.vine[0].tree
-        for edge in tree_0.edges():
-            n0, n1 = edge
-            edge_info = tree_0[n0][n1]
+        for n0, n1, edge in self.vine[0]._orderedEdges():
             if not n0 in list(sample_result.keys()):
-                sample_result[n0] = edge_info['sample'][n0]
+                sample_result[n0] = edge.sample[n0]
             if not n1 in list(sample_result.keys()):
-                sample_result[n1] = edge_info['sample'][n1]
+                sample_result[n1] = edge.sample[n1]
 
         # clean up
         for base_tree in self.vine:
-            for edge in base_tree.tree.edges():
-                n0, n1 = edge
-                base_tree.tree[n0][n1].pop('sample')
+            for edge in base_tree.edges:
+                edge.sample = None
 
         # convert sample dict of arrays to dataFrame
         return pd.DataFrame(sample_result)
@@ -192,12 +200,13 @@ class BaseVine(object):
         for i, treeL in enumerate(self.vine):
             plt.subplot(self.nLevels, 1, i + 1)
             plt.title("Tree Level: %d" % i)
-            pos = nx.spring_layout(treeL.tree)
-            nx.draw(treeL.tree, pos, with_labels=True, font_size=10, font_weight="bold")
+            treeGraph = treeL.to_networkx()
+            pos = nx.spring_layout(treeGraph)
+            nx.draw(treeGraph, pos, with_labels=True, font_size=10, font_weight="bold")
             # specifiy edge labels explicitly
             edge_labels = dict([((u, v,), round(d['weight'], 2))
-                                for u, v, d in treeL.tree.edges(data=True)])
-            nx.draw_networkx_edge_labels(treeL.tree, pos, edge_labels=edge_labels)
+                                for u, v, d in treeGraph.edges(data=True)])
+            nx.draw_networkx_edge_labels(treeGraph, pos, edge_labels=edge_labels)
         if savefig is not None:
             plt.savefig(savefig)
         plt.close(10)
@@ -5,30 +5,73 @@
 from pandas import DataFrame
 from itertools import chain
 from starvine.bvcopula import pc_base as pc
+from starvine.bvcopula.copula import _kernels as kern
 import networkx as nx
 import numpy as np
 
 
+class _Edge(object):
+    """!
+    @brief Edge of a tree: the node pair, its empirical kendall's tau,
+    pair copula and (once fitted) copula model, h and hinv functions,
+    location of its parameters in the tree copula parameter array,
+    one fold triplet in the tree above and the samples drawn at its nodes.
+    """
+    __slots__ = ("i", "j", "tau", "pc", "pcmodel", "h", "hinv", "paramMap",
+                 "oneFold", "sample")
+
+    def __init__(self, i, j, tau, pc):
+        self.i, self.j, self.tau, self.pc = i, j, tau, pc
+        self.pcmodel, self.h, self.hinv, self.paramMap = None, None, None, None
+        self.oneFold, self.sample = None, None
+
+
 class Vtree(object):
     def __init__(self, data, lvl, parentTree=None, **kwargs):
         """!
         @brief A generic tree within vine.
-        @param data <b>DataFrame</b>  multivariate data set. Each data
-                                      column will be assigned to a node.
+        @param data <b>DataFrame</b> or <b>np_2darray</b> multivariate data set.
+                                      Each data column will be assigned to a node.
         @param lvl <b>int</b>: tree level in the vine
         @param weights <b>DataFrame</b>: (optional) data weights
-        @param labels <b>list</b> of <b>str</b> or <b>ints</b>: (optional) data labels
+        @param labels <b>list</b> of <b>str</b> or <b>ints</b>: (optional) data labels.
+                      Used for np_2darray input, defaults to range(ncols)
         """
-        assert(type(data) is DataFrame)
-        assert(len(data.shape) == 2)
+        labels = kwargs.pop("labels", None)
+        if isinstance(data, DataFrame):
+            labels = data.columns
+            X = data.values
+        else:
+            # ndarray input: used as is, no round trip through a DataFrame
+            X = data
         self.trial_copula_dict = kwargs.get("trial_copula", {})
         self.data = data
+        # all samples in a single float64 matrix.  float64 input of either
+        # memory layout is used without a copy, the columns (nodes) may be
+        # strided views.  Nodes and edges only hold integer column indices /
+        # views into this buffer.  Copied before addNode() writes to it.
+        self._X = np.asarray(X, dtype=np.float64)
+        self._ownX = not np.shares_memory(self._X, X)
+        assert(self._X.ndim == 2)
+        if labels is None:
+            labels = range(self._X.shape[1])
+        assert(len(labels) == self._X.shape[1])
+        # rank transform every column once.  Reused by all tau evaluations.
+        self._ranks = kern.pseudo_obs_avg_cols(self._X, np.empty_like(self._X, order='F'))
+        self._colIdx = dict((label, i) for i, label in enumerate(labels))
+        # empirical kendall's tau of ranked column pairs, valid for the
+        # lifetime of self._ranks.  See _ktau()
+        self._tauCache = {}
         self._upperTree = parentTree
         #
-        self.nT = data.shape[1]
+        self.nT = self._X.shape[1]
         self.level = lvl
         #
-        self.tree = nx.Graph()
+        # flat edge list, walked by the fitting, likelihood and sampling
+        # methods.  _adj[nodeA][nodeB] is the edge between two nodes.
+        # See to_networkx() for a graph view of the tree.
+        self.edges = []
+        self._adj = {}
         self.buildNodes()  # Construct nodes
         self.setEdges()    # Build edges between nodes
 
@@ -38,39 +81,105 @@ class Vtree(object):
         @param dataLabel <b>int</b> or <b>str</b>
         @param data <b>np_1darray</b>
         """
-        if dataLabel in self.tree.nodes():
-            self.tree.node[dataLabel]["data"].update(data)
+        if dataLabel in self._colIdx:
+            col = self._colIdx[dataLabel]
+            if not self._ownX:
+                # do not overwrite the caller's data
+                self._X = self._X.copy(order='F')
+                self._ownX = True
+            self._X[:, col] = data
         else:
-            self.tree.add_node(dataLabel, data=data)
+            col = self._X.shape[1]
+            self._X = np.asfortranarray(np.column_stack((self._X, data)))
+            self._ownX = True
+            self._ranks = np.asfortranarray(np.column_stack((self._ranks, np.zeros(self._X.shape[0]))))
+            self._colIdx[dataLabel] = col
+            self._adj[dataLabel] = {}
+        kern.pseudo_obs_avg(self._X[:, col], self._ranks[:, col])
+        self._tauCache = {}
 
     def buildNodes(self):
         """!
-        @brief Assign each data column to a networkx node.
+        @brief Assign each data column to a node.
+        Each node is identified by its label, self._colIdx maps
+        the label to the column index of its data in self._X
         """
-        for colName in self.data:
-            self.tree.add_node(colName, data=self.data[colName])
+        self._tauCache = {}
+        for colName in self.nodeIDs():
+            self._adj[colName] = {}
+
+    def nodeIDs(self):
+        """!
+        @brief Node labels, in data column order.
+        @return <b>list</b>
+        """
+        return sorted(self._colIdx, key=self._colIdx.get)
+
+    def nodeData(self, nodeID):
+        """!
+        @brief Data at a node.
+        @param nodeID <b>int</b> or <b>str</b> node label
+        @return <b>np_1darray</b> view into the tree's sample matrix
+        """
+        return self._X[:, self._colIdx[nodeID]]
 
     def setEdges(self, nodePairs=None):
         """!
         @brief Sets the node to node connections in the tree.
-        @param nodePairs <b>list</b> List of len 3 <b>tuples</b>:
+        @param nodePairs <b>list</b> List of len 4 <b>tuples</b>:
+
+            [(dataLabel_1, dataLabel_2, kTau, PairCopula), ...]
 
-            [(dataLabel_1, dataLabel_2, kTau), ...]
+            len 3 tuples (without the pair copula) are also accepted,
+            the pair copula is then constructed here.
         """
         nodePairs = self._optimNodePairs() if nodePairs is None else nodePairs
         for i, pair in enumerate(nodePairs):
-            self.tree.add_edge(pair[0], pair[1], weight=pair[2],
-                                          pc= \
-                                          pc.PairCopula(self.tree.node[pair[0]]["data"],
-                                                        self.tree.node[pair[1]]["data"],
-                                                        id=(pair[0], pair[1]),
-                                                        family=self.trial_copula_dict),
-                                          id=(pair[0], pair[1]),
-                                          edge_data={pair[0]: self.tree.node[pair[0]]["data"],
-                                                     pair[1]: self.tree.node[pair[1]]["data"]},
-                              )
+            pairCopula = pair[3] if len(pair) > 3 else self._pairCopula(pair[0], pair[1])
+            edge = _Edge(pair[0], pair[1], pair[2], pairCopula)
+            self.edges.append(edge)
+            self._adj[pair[0]][pair[1]] = self._adj[pair[1]][pair[0]] = edge
         self._setEdgeTriplets()
 
+    def _pairCopula(self, nodeA, nodeB):
+        """!
+        @brief Construct the pair copula of an edge between two nodes.
+        @param nodeA <b>int</b> or <b>str</b> node label
+        @param nodeB <b>int</b> or <b>str</b> node label
+        @return <b>PairCopula</b>
+        """
+        return pc.PairCopula(self.nodeData(nodeA),
+                             self.nodeData(nodeB),
+                             id=(nodeA, nodeB),
+                             family=self.trial_copula_dict,
+                             ranks=(self._ranks[:, self._colIdx[nodeA]],
+                                    self._ranks[:, self._colIdx[nodeB]]))
+
+    def _orderedEdges(self):
+        """!
+        @brief Edges as (u, v, edge) with u the node of the lower data
+        column, the orientation used for one fold triplets and sampling.
+        """
+        for edge in self.edges:
+            if self._colIdx[edge.i] <= self._colIdx[edge.j]:
+                yield edge.i, edge.j, edge
+            else:
+                yield edge.j, edge.i, edge
+
+    def to_networkx(self):
+        """!
+        @brief Graph view of the tree, built from the edge list.  Used for
+        plotting, changes to the graph do not affect the tree.
+        @return <b>networkx.Graph</b> with node attribute "col" and edge
+                attributes "weight" (kendall's tau), "pc" and "id"
+        """
+        graph = nx.Graph()
+        for nodeID in self.nodeIDs():
+            graph.add_node(nodeID, col=self._colIdx[nodeID])
+        for edge in self.edges:
+            graph.add_edge(edge.i, edge.j, weight=edge.tau, pc=edge.pc, id=(edge.i, edge.j))
+        return graph
+
     def _setEdgeTriplets(self):
         """!
         @brief Applies to all non-zero level trees in the vine.
@@ -81,7 +190,7 @@ class Vtree(object):
         if self.upperTree is None:
             return
         else:
-            for u, v in self.tree.edges():
+            for u, v, edge in self._orderedEdges():
                 # every edge has data nodes (u, v)
                 # u and v  are tuples
                 # each node came from an edge above
@@ -97,8 +206,7 @@ class Vtree(object):
                         n_sides.append(node)
                 assert(n_anchors[0] == n_anchors[1])
                 # Set one fold triplet of each edge
-                self.tree[u][v]['one-fold'] = \
-                    (n_sides[0], n_sides[1], n_anchors[0])
+                edge.oneFold = (n_sides[0], n_sides[1], n_anchors[0])
 
     def _optimNodePairs(self):
         """!
@@ -106,9 +214,9 @@ class Vtree(object):
         tree which maximizes dependence. (private method)
 
         Virtual function.
-        @return <b>list</b> List of len 3 <b>tuples</b>:
+        @return <b>list</b> List of len 4 <b>tuples</b>:
 
-            [(dataLabel_1, dataLabel_2, kTau), ...]
+            [(dataLabel_1, dataLabel_2, kTau, PairCopula), ...]
         """
         raise NotImplementedError
 
@@ -123,12 +231,58 @@ class Vtree(object):
         # compute edge weights
         treeStructure = []
         for pair in existingTreeStruct:
-            trialPair = \
-                pc.PairCopula(self.tree.node[pair[0]]["data"].values,
-                              self.tree.node[pair[1]]["data"].values)
-            treeStructure.append((pair[0], pair[1], trialPair.empKTau()[0]))
+            treeStructure.append((pair[0], pair[1], self._ktau(pair[0], pair[1]),
+                                  self._pairCopula(pair[0], pair[1])))
         return treeStructure
 
+    def _ktau(self, nodeA, nodeB):
+        """!
+        @brief Empirical kendall's tau between the data at two nodes.
+        Memoized on the ranked data buffers, see _tauKey().
+        @param nodeA <b>int</b> or <b>str</b> node label
+        @param nodeB <b>int</b> or <b>str</b> node label
+        @return <b>float</b> kendall's tau
+        """
+        rankA = self._ranks[:, self._colIdx[nodeA]]
+        rankB = self._ranks[:, self._colIdx[nodeB]]
+        key = self._tauKey(rankA, rankB)
+        if key not in self._tauCache:
+            self._tauCache[key] = pc.jit_ktau(rankA, rankB)
+        return self._tauCache[key]
+
+    def _ktauMatrix(self, nodeIDs):
+        """!
+        @brief Empirical kendall's tau matrix between all nodes.
+        Filled from the tau cache if every pair is already known, else
+        computed in a single pass and stored in the cache.
+        @param nodeIDs <b>list</b> node labels, sets the row/col order
+        @return <b>np_2darray</b> symmetric tau matrix with zero diagonal
+        """
+        cols = [self._ranks[:, self._colIdx[nodeID]] for nodeID in nodeIDs]
+        keys = [[self._tauKey(ci, cj) for cj in cols] for ci in cols]
+        d = len(nodeIDs)
+        if all(keys[i][j] in self._tauCache for i in range(d) for j in range(i + 1, d)):
+            ktauMatrix = np.zeros((d, d))
+            for i in range(d):
+                for j in range(i + 1, d):
+                    ktauMatrix[i, j] = ktauMatrix[j, i] = self._tauCache[keys[i][j]]
+            return ktauMatrix
+        colIdx = np.array([self._colIdx[nodeID] for nodeID in nodeIDs], dtype=np.int64)
+        ktauMatrix = pc.jit_ktau_submatrix(self._ranks, colIdx)
+        for i in range(d):
+            for j in range(i + 1, d):
+                self._tauCache[keys[i][j]] = ktauMatrix[i, j]
+        return ktauMatrix
+
+    @staticmethod
+    def _tauKey(rankA, rankB):
+        """!
+        @brief Cache key of a ranked column pair: the (sorted) data
+        pointers of both columns and the column length.
+        """
+        ptrA, ptrB = rankA.ctypes.data, rankB.ctypes.data
+        return (min(ptrA, ptrB), max(ptrA, ptrB), len(rankA))
+
     def _exportTree(self):
         """!
         @brief Export tree for later use or storage.
@@ -181,8 +335,8 @@ class Vtree(object):
             ### Next Tree ###
                           (next_u_n0) -------- next_edge --------- (next_u_n1)
 
-        To go "up" the vine requires evaluation of hinv-dist
-        To traverse down the vine, evaluate the conditional h-dist function.
+        To go "up" the vine requires evaluation of the edge's hinv function
+        To traverse down the vine, evaluate the conditional h function.
 
         @param n0  Wing node in current tree
         @param n1  central node in current tree
@@ -190,30 +344,26 @@ class Vtree(object):
         @param old_n1  Node_1 from lowerTree
         @param size <b>int</b>  sample size
         """
-        def unrollNodes(l):
-            try:
-                flt = list(chain.from_iterable(l))
-            except:
-                return l
-            return unrollNodes(flt)
-
-        if type(n0) is int or type(n0) is np.int64 or type(n0) is str:
-            tree_num = 0
-        else:
-            # Determine tree level from number of nodes (#nodes are powers of 2)
-            tree_num = int(np.log(len(unrollNodes(n0))) / np.log(2)) - 1
-        current_tree = vine[tree_num].tree
-        next_tree = vine[tree_num + 1].tree
-        edge_info = current_tree[n0][n1]
+        def unrollNodes(node):
+            # only unroll the node tuples, not the labels themselves
+            if isinstance(node, tuple):
+                return list(chain.from_iterable(unrollNodes(n) for n in node))
+            return [node]
+
+        # Determine tree level from number of nodes (#nodes are powers of 2)
+        tree_num = int(round(np.log2(len(unrollNodes(n0)))))
+        current_tree = vine[tree_num]
+        next_tree = vine[tree_num + 1]
+        edge = current_tree._adj[n0][n1]
 
         # if both marginal samples exist on this edge,
         # nothing to do.
-        if 'sample' in edge_info and \
-                len(edge_info['sample']) == 2:
+        if edge.sample is not None and \
+                len(edge.sample) == 2:
             return
 
         # if u_n0 and u_n1 both dont exist, or if only u_n0 exists
-        if 'sample' not in edge_info or n1 not in edge_info['sample']:
+        if edge.sample is None or n1 not in edge.sample:
             if tree_num == 0:
                 u_n1 = np.random.rand(size)
             # if we are not in the first tree:
@@ -221,51 +371,46 @@ class Vtree(object):
             else:
                 if not self.upperTree:
                     raise RuntimeError("Upper tree requested but unavalible.")
-                prev_n0, prev_n1, prev_n2 = edge_info["one-fold"]
-                prev_tree = vine[tree_num - 1].tree
+                prev_n0, prev_n1, prev_n2 = edge.oneFold
+                prev_tree = vine[tree_num - 1]
                 if not (prev_n0, prev_n2) == n1:
                     prev_n0 = prev_n1
-                prev_edge_info = prev_tree[prev_n0][prev_n2]
-                if 'sample' in prev_edge_info and \
-                        len(prev_edge_info['sample']) == 2:
-                    u_prev_n0 = prev_edge_info['sample'][prev_n0]
-                    u_prev_n2 = prev_edge_info['sample'][prev_n2]
-                    u_n1 = prev_edge_info["h-dist"](u_prev_n2, u_prev_n0)
+                prev_edge = prev_tree._adj[prev_n0][prev_n2]
+                if prev_edge.sample is not None and \
+                        len(prev_edge.sample) == 2:
+                    u_prev_n0 = prev_edge.sample[prev_n0]
+                    u_prev_n2 = prev_edge.sample[prev_n2]
+                    u_n1 = prev_edge.h(u_prev_n2, u_prev_n0)
                 else:
                     u_n1 = np.random.rand(size)
         else:
-            u_n1 = edge_info['sample'][n1]
+            u_n1 = edge.sample[n1]
 
-        next_tree_info = next_tree[old_n0][old_n1]
+        next_edge = next_tree._adj[old_n0][old_n1]
         try:
-            u_n0 = edge_info["hinv-dist"](u_n1, next_tree_info['sample'][(n0, n1)])
+            u_n0 = edge.hinv(u_n1, next_edge.sample[(n0, n1)])
         except:
-            # u_n0 = edge_info["hinv-dist"](u_n1, next_tree_info['sample'][(n1, n0)])
+            # u_n0 = edge.hinv(u_n1, next_edge.sample[(n1, n0)])
             raise RuntimeError("Edge with nodes: " + str((n0, n1)), " does not exist.")
-        edge_sample = {n0: u_n0, n1: u_n1}
-        current_tree[n0][n1]['sample'] = edge_sample
+        edge.sample = {n0: u_n0, n1: u_n1}
 
         # If current tree is 0th tree: copy marginal sample to
         # neighbor edge
         if tree_num == 0:
-            for one_node in current_tree.neighbors(n0):
-                if 'sample' not in current_tree[n0][one_node]:
-                    edge_sample = {n0:u_n0}
-                    current_tree[n0][one_node]['sample'] = edge_sample
-                else:
-                    if n0 not in current_tree[n0][one_node]['sample']:
-                        current_tree[n0][one_node]['sample'][n0] = u_n0
-            for one_node in current_tree.neighbors(n1):
-                if 'sample' not in current_tree[n1][one_node]:
-                    edge_sample = {n1:u_n1}
-                    current_tree[n1][one_node]['sample'] = edge_sample
-                else:
-                    if n1 not in current_tree[n1][one_node]['sample']:
-                        current_tree[n1][one_node]['sample'][n1] = u_n1
+            for one_edge in current_tree._adj[n0].values():
+                if one_edge.sample is None:
+                    one_edge.sample = {n0: u_n0}
+                elif n0 not in one_edge.sample:
+                    one_edge.sample[n0] = u_n0
+            for one_edge in current_tree._adj[n1].values():
+                if one_edge.sample is None:
+                    one_edge.sample = {n1: u_n1}
+                elif n1 not in one_edge.sample:
+                    one_edge.sample[n1] = u_n1
             return
 
         # Traverse up the vine one level
-        prev_n0, prev_n1, prev_n2 = edge_info['one-fold']
+        prev_n0, prev_n1, prev_n2 = edge.oneFold
         self._sampleEdge(prev_n0, prev_n2, n0, n1, size, vine)
         self._sampleEdge(prev_n1, prev_n2, n0, n1, size, vine)
         return
@@ -2,10 +2,10 @@
 from __future__ import print_function, division
 # starvine imports
 import context
-from starvine.vine.C_vine import Cvine
+from starvine.vine.C_vine import Cvine, Ctree
 from starvine.mvar.mv_plot import matrixPairPlot
 # extra imports
-from scipy.stats import norm, beta
+from scipy.stats import norm, beta, kendalltau
 import unittest
 import os
 import numpy as np
@@ -13,6 +13,8 @@ import pandas as pd
 pwd_ = os.path.dirname(os.path.abspath(__file__))
 dataDir = pwd_ + "/data/"
 np.random.seed(123)
+# diagnostic plots are opt-in
+makePlots = os.environ.get("STARVINE_TEST_PLOTS")
 
 
 class TestCvine(unittest.TestCase):
@@ -31,11 +33,13 @@ class TestCvine(unittest.TestCase):
         tstData['4d'] = p
         tstData['5e'] = e
         # Visualize multivar data
-        matrixPairPlot(tstData, savefig="quad_varaite_ex.png")
+        if makePlots:
+            matrixPairPlot(tstData, savefig="quad_varaite_ex.png")
         # Visualize multivar ranked data
         ranked_data = tstData.dropna().rank()/(len(tstData)+1)
         # ranked_data['1a'] = ranked_data['1a']
-        matrixPairPlot(ranked_data, savefig="quad_varaite_ranked_ex.png")
+        if makePlots:
+            matrixPairPlot(ranked_data, savefig="quad_varaite_ranked_ex.png")
 
         # Init Cvine
         tstVine = Cvine(ranked_data)
@@ -44,11 +48,13 @@ class TestCvine(unittest.TestCase):
         tstVine.constructVine()
 
         # plot vine
-        tstVine.plotVine(savefig="c_vine_graph_ex.png")
+        if makePlots:
+            tstVine.plotVine(savefig="c_vine_graph_ex.png")
 
         # sample from vine
         c_vine_samples = tstVine.sample(n=8000)
-        matrixPairPlot(c_vine_samples, savefig="vine_resampled_ex.png")
+        if makePlots:
+            matrixPairPlot(c_vine_samples, savefig="vine_resampled_ex.png")
 
         # check that the original data has same correlation coefficients as re-sampled
         # data from the fitted c-vine
@@ -77,7 +83,8 @@ class TestCvine(unittest.TestCase):
             marginal_dict[col_name] = beta(*beta.fit(tstData[col_name]))
         # scale the samples
         c_vine_scaled_samples_a = tstVine.scaleSamples(c_vine_samples, marginal_dict)
-        matrixPairPlot(c_vine_scaled_samples_a, savefig="vine_varaite_resampled_scaled_a.png")
+        if makePlots:
+            matrixPairPlot(c_vine_scaled_samples_a, savefig="vine_varaite_resampled_scaled_a.png")
 
         c_vine_scaled_samples_b = tstVine.sampleScale(8000, marginal_dict)
 
@@ -89,6 +96,107 @@ class TestCvine(unittest.TestCase):
         self.assertTrue(np.allclose(tst_rho_matrix - sample_scaled_rho_matrix_a, 0, atol=0.1))
         self.assertTrue(np.allclose(tst_rho_matrix - sample_scaled_rho_matrix_b, 0, atol=0.1))
 
+    def testCvineNdarray(self):
+        stocks = np.loadtxt(dataDir + 'stocks.csv', delimiter=',')
+        ranked_data = pd.DataFrame(stocks[:, [0, 1, 4, 5]]).rank() / (len(stocks) + 1)
+        # ndarray input with default (integer) and user supplied labels
+        frameVine = Cvine(pd.DataFrame(ranked_data.values, columns=['a', 'b', 'c', 'd']))
+        frameVine.constructVine()
+        arrayVine = Cvine(ranked_data.values)
+        arrayVine.constructVine()
+        labelVine = Cvine(ranked_data.values, labels=['a', 'b', 'c', 'd'])
+        labelVine.constructVine()
+        self.assertEqual(frameVine.vine[0].rootNodeID, labelVine.vine[0].rootNodeID)
+        self.assertEqual(frameVine.vine[0].rootNodeID,
+                         ['a', 'b', 'c', 'd'][arrayVine.vine[0].rootNodeID])
+        self.assertAlmostEqual(frameVine.vineNLLH(), arrayVine.vineNLLH())
+        self.assertAlmostEqual(frameVine.vineNLLH(), labelVine.vineNLLH())
+        self.assertEqual(arrayVine.sample(n=100).shape, (100, 4))
+        self.assertEqual(sorted(labelVine.sample(n=100).columns), ['a', 'b', 'c', 'd'])
+
+    def testCtreeNoCopy(self):
+        stocks = np.loadtxt(dataDir + 'stocks.csv', delimiter=',')[:, [0, 1, 4, 5]]
+        # float64 input of either memory layout is used as is
+        cTree = Ctree(np.ascontiguousarray(stocks), lvl=0)
+        fTree = Ctree(np.asfortranarray(stocks), lvl=0)
+        self.assertTrue(np.shares_memory(cTree._X, cTree.data))
+        self.assertTrue(np.shares_memory(fTree._X, fTree.data))
+        self.assertEqual(cTree.rootNodeID, fTree.rootNodeID)
+        self.assertTrue(np.array_equal(cTree._ranks, fTree._ranks))
+        self.assertTrue(np.array_equal(cTree.nodeData(1), stocks[:, 1]))
+        # other dtypes are converted, addNode copies before writing
+        self.assertFalse(np.shares_memory(Ctree(stocks.astype(np.float32), lvl=0)._X, stocks))
+        X = np.ascontiguousarray(stocks)
+        tree = Ctree(X, lvl=0)
+        tree.addNode(2, stocks[:, 0])
+        self.assertTrue(np.array_equal(X[:, 2], stocks[:, 2]))
+        self.assertTrue(np.array_equal(tree.nodeData(2), stocks[:, 0]))
+        self.assertTrue(np.array_equal(tree._ranks[:, 2], tree._ranks[:, 0]))
+
+    def testCtreeGraphView(self):
+        stocks = np.loadtxt(dataDir + 'stocks.csv', delimiter=',')
+        vine = Cvine(pd.DataFrame(stocks[:, [0, 1, 4, 5]]).rank() / (len(stocks) + 1))
+        vine.constructVine()
+        vine.sample(n=100)
+        for tree in vine.vine:
+            # the graph is built from the edge list, the tree holds no samples
+            graph = tree.to_networkx()
+            self.assertEqual(sorted(graph.nodes(), key=str), sorted(tree.nodeIDs(), key=str))
+            self.assertEqual(graph.number_of_edges(), len(tree.edges))
+            for edge in tree.edges:
+                self.assertEqual(graph[edge.i][edge.j]["weight"], edge.tau)
+                self.assertIs(graph[edge.i][edge.j]["pc"], edge.pc)
+                self.assertIsNone(edge.sample)
+            graph.remove_edges_from(list(graph.edges()))
+            self.assertEqual(tree.to_networkx().number_of_edges(), len(tree.edges))
+
+    def testCvineParallelFit(self):
+        stocks = np.loadtxt(dataDir + 'stocks.csv', delimiter=',')
+        ranked_data = pd.DataFrame(stocks[:, [0, 1, 4, 5]]).rank() / (len(stocks) + 1)
+        seqVine = Cvine(ranked_data)
+        seqVine.constructVine()
+        # edge copula fits of the top tree are spread over a process pool
+        poolVine = Cvine(ranked_data, procs=2)
+        poolVine.constructVine()
+        for seqTree, poolTree in zip(seqVine.vine, poolVine.vine):
+            for seqEdge, poolEdge in zip(seqTree.edges, poolTree.edges):
+                self.assertEqual(seqEdge.pc.copulaParams[0], poolEdge.pc.copulaParams[0])
+        self.assertAlmostEqual(seqVine.vineNLLH(), poolVine.vineNLLH())
+        self.assertEqual(poolVine.sample(n=100).shape, (100, 4))
+
+    def testCvineRawDataNLLH(self):
+        stocks = np.loadtxt(dataDir + 'stocks.csv', delimiter=',')
+        # unranked data: the edge copulas are fit on the pair copula ranks
+        rawVine = Cvine(pd.DataFrame(stocks[:, [0, 1, 4, 5]]))
+        rawVine.constructVine()
+        for tree in rawVine.vine:
+            edgeNLLH = 0.
+            for edge in tree.edges:
+                copula = edge.pc.copulaModel
+                edgeNLLH += copula._nlogLike(edge.pc.UU, edge.pc.VV, None, 0,
+                                             *edge.pc.copulaParams[1])
+            self.assertAlmostEqual(tree.treeNLLH(), edgeNLLH)
+        self.assertTrue(np.isfinite(rawVine.vineNLLH()))
+
+    def testCtreeRootSearch(self):
+        # root maximizes the |tau| sum over its edges, on wide data
+        rng = np.random.RandomState(42)
+        for d in (11, 16, 24):
+            z = rng.randn(500, 1)
+            X = z * rng.uniform(-1, 1, (1, d)) + rng.randn(500, d)
+            tree = Ctree(X, lvl=0)
+            ktauSum = [sum(abs(kendalltau(X[:, i], X[:, j])[0]) for j in range(d) if j != i)
+                       for i in range(d)]
+            self.assertEqual(tree.rootNodeID, int(np.argmax(ktauSum)))
+        # tie: columns are +-copies of z or w with tau(z, w) == 0, so the
+        # |tau| sum of every root is exactly 5.  The first root is picked.
+        z = np.arange(8.)
+        w = np.array([0., 1., 6., 7., 5., 4., 3., 2.])
+        X = np.column_stack([w, z, -w, -z, w, z, -w, -z, w, z, -w, -z])
+        tree = Ctree(X, lvl=0)
+        ktauSum = np.abs(tree._ktauMatrix(tree.nodeIDs())).sum(axis=1)
+        self.assertTrue(np.all(ktauSum == 5.))
+        self.assertEqual(tree.rootNodeID, 0)
 
 if __name__ == "__main__":
     unittest.main()